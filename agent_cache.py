@@ -0,0 +1,162 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import functools
+import threading
+from typing import Any, Dict, Optional, Sequence
+
+import lancedb
+
+from embed_cache import CachedGeminiEmbedder
+from query_cache import QueryCache
+from config import settings
+
+CACHE_DB_FILE = "./workspaces/db/agent_cache.db"
+SEMANTIC_CACHE_TABLE = "agent_response_cache"
+# Minimum cosine similarity before a cached response is reused for a different prompt
+SEMANTIC_THRESHOLD = 0.92
+# Rows kept in the exact-match tier before least recently used responses are evicted
+EXACT_CACHE_MAX_ENTRIES = 5000
+
+class SqliteResponseCache:
+    """
+    Persistent exact-match response cache backed by SQLite and fronted by an in-memory LRU.
+    When max_entries is set, the least recently used rows are evicted beyond that size.
+    """
+
+    def __init__(self, db_file: str, max_entries: Optional[int] = None, memory_size: int = 512):
+        self.db_file = db_file
+        self.max_entries = max_entries
+        self._memory = QueryCache(maxsize=memory_size, ttl=None)
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_file), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_file, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, response TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        response = self._memory.get(key)
+        if response is not None:
+            return response
+
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+        self._memory.set(key, row[0])
+        return row[0]
+
+    def set(self, key: str, response: str):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, last_used) VALUES (?, ?, ?)",
+                (key, response, time.time())
+            )
+            if self.max_entries is not None:
+                conn.execute(
+                    "DELETE FROM responses WHERE key NOT IN (SELECT key FROM responses ORDER BY last_used DESC LIMIT ?)",
+                    (self.max_entries,)
+                )
+            conn.commit()
+        self._memory.set(key, response)
+
+# Tier 0: exact prompt + exact keys
+_exact_cache = SqliteResponseCache(CACHE_DB_FILE, max_entries=EXACT_CACHE_MAX_ENTRIES)
+_semantic_lock = threading.Lock()
+
+@functools.lru_cache(maxsize=1)
+def _embedder() -> CachedGeminiEmbedder:
+    return CachedGeminiEmbedder(id=settings().embedding_model)
+
+@functools.lru_cache(maxsize=1)
+def _semantic_db():
+    return lancedb.connect(settings().lancedb_uri)
+
+def _open_semantic_table():
+    try:
+        return _semantic_db().open_table(SEMANTIC_CACHE_TABLE)
+    except (ValueError, FileNotFoundError):
+        return None
+
+def _semantic_lookup(vector: list, exact_key: str) -> Optional[str]:
+    table = _open_semantic_table()
+    if table is None:
+        return None
+    rows = (
+        table.search(vector)
+        .distance_type("cosine")
+        .where(f"exact_key = '{exact_key}'", prefilter=True)
+        .limit(1)
+        .to_list()
+    )
+    if rows and 1 - rows[0]["_distance"] >= SEMANTIC_THRESHOLD:
+        return rows[0]["response"]
+    return None
+
+def _semantic_store(vector: list, prompt: str, response: str, exact_key: str, exact_keys: Dict[str, str]):
+    row = {
+        "vector": vector,
+        "prompt": prompt,
+        "response": response,
+        "exact_key": exact_key,
+        "exact_keys": json.dumps(exact_keys, sort_keys=True),
+        "ts": time.time(),
+    }
+    with _semantic_lock:
+        table = _open_semantic_table()
+        if table is None:
+            _semantic_db().create_table(SEMANTIC_CACHE_TABLE, data=[row])
+        else:
+            table.add([row])
+
+def cached_agent_run(agent, prompt: str, images: Optional[Sequence[Any]] = None,
+                     exact_keys: Optional[Dict[str, str]] = None, semantic: bool = True) -> str:
+    """
+    Runs agent.run(prompt, images=images) behind a two-tier response cache and returns the response content.
+    Tier 0 is an exact match on the prompt plus exact_keys, persisted in SQLite across restarts.
+    Tier 1 reuses the response of a semantically similar prompt (cosine >= SEMANTIC_THRESHOLD),
+    but only when every exact key (the model id, plus e.g. an image hash) matches too.
+    Pass semantic=False for runs that must not be answered from a paraphrased prompt.
+    """
+    exact_keys = {"model": str(agent.model.id), **(exact_keys or {})}
+    exact_key = hashlib.sha256(json.dumps(exact_keys, sort_keys=True).encode("utf-8")).hexdigest()
+    key = hashlib.sha256((exact_key + "\x00" + prompt).encode("utf-8")).hexdigest()
+
+    response = _exact_cache.get(key)
+    if response is not None:
+        print(f"[Agent Cache] Exact hit for {agent.name}.")
+        return response
+
+    vector = None
+    if semantic:
+        try:
+            vector = _embedder().get_embedding(prompt)
+            response = _semantic_lookup(vector, exact_key)
+        except Exception as e:
+            print(f"[Agent Cache] Semantic lookup failed: {e}")
+        if response is not None:
+            print(f"[Agent Cache] Semantic hit for {agent.name}.")
+            _exact_cache.set(key, response)
+            return response
+
+    response = agent.run(prompt, images=images).content
+    if response:
+        _exact_cache.set(key, response)
+        if vector:
+            try:
+                _semantic_store(vector, prompt, response, exact_key, exact_keys)
+            except Exception as e:
+                print(f"[Agent Cache] Failed to store semantic entry: {e}")
+    return response
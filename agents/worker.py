@@ -1,36 +1,70 @@
 import argparse
+import asyncio
+import functools
 import os
+import sys
 import json
 from agno.agent import Agent
 from agno.models.google import Gemini
 from agno.knowledge import Knowledge
 from agno.vectordb.lancedb import LanceDb
 from agno.knowledge.embedder.openai import OpenAIEmbedder
-from dotenv import load_dotenv
 
-load_dotenv()
+if __package__ in (None, ""):
+    # Run as a script (python agents/worker.py): make the project's top-level modules importable
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import settings
 
-def run_worker(role: str, goal: str, workspace_dir: str):
+@functools.lru_cache(maxsize=1)
+def _get_kb() -> Knowledge:
+    """Returns the shared LanceDB knowledge base, connecting on first use."""
+    return Knowledge(
+        vector_db=LanceDb(
+            table_name="soae_knowledge",
+            uri=settings().knowledge_uri,
+            embedder=OpenAIEmbedder(id=settings().embedding_model),
+        ),
+    )
+
+@functools.lru_cache(maxsize=1)
+def _get_model() -> Gemini:
+    """Returns the shared Gemini model client used by every worker in this process."""
+    return Gemini(id=settings().light_model)
+
+def _write_result_atomic(result_file: str, result: dict):
+    """
+    Writes result.json through a temp file and an atomic rename,
+    so a polling reader never sees a partially written file.
+    """
+    # Compact encoding: this file is machine-read; the kernel pretty-prints for the final report
+    buf = memoryview(json.dumps(result, separators=(",", ":")).encode("utf-8"))
+    tmp_file = result_file + ".tmp"
+    fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        while buf:
+            buf = buf[os.write(fd, buf):]
+        getattr(os, "fdatasync", os.fsync)(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp_file, result_file)
+
+async def run_worker_async(role: str, goal: str, workspace_dir: str, knowledge_base: Knowledge = None) -> dict:
     """
     Runs an independent worker agent using Gemini
     and shared LanceDB knowledge.
+    Pass the caller's knowledge_base to share its LanceDB connection when running in-process.
     """
     print(f"Starting worker: Role='{role}', Goal='{goal}'")
     
     # Connect to shared LanceDB knowledge base
-    knowledge_base = Knowledge(
-        vector_db=LanceDb(
-            table_name="soae_knowledge",
-            uri="tmp/lancedb",
-            embedder=OpenAIEmbedder(id=os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")),
-        ),
-    )
+    if knowledge_base is None:
+        knowledge_base = _get_kb()
     
     # Create the Gemini agent
     agent = Agent(
         name="LocalWorker",
         role=role,
-        model=Gemini(id=os.getenv("LIGHT_MODEL", "gemini-2.5-flash")),
+        model=_get_model(),
         knowledge=knowledge_base,
         search_knowledge=True, # Allow it to search the shared KB
         instructions=[
@@ -41,7 +75,7 @@ def run_worker(role: str, goal: str, workspace_dir: str):
     )
     
     try:
-        response = agent.run(goal)
+        response = await agent.arun(goal)
         result = {
             "status": "success",
             "role": role,
@@ -58,10 +92,17 @@ def run_worker(role: str, goal: str, workspace_dir: str):
 
     # Write result to IPC file (workspaces/{unique_id}/result.json)
     result_file = os.path.join(workspace_dir, "result.json")
-    with open(result_file, "w") as f:
-        json.dump(result, f, indent=2)
+    # The fsync would otherwise stall every task sharing this event loop
+    await asyncio.to_thread(_write_result_atomic, result_file, result)
     
     print(f"Worker completed. Result written to {result_file}")
+    return result
+
+def run_worker(role: str, goal: str, workspace_dir: str):
+    """
+    Runs a worker to completion in its own process (cross-process fallback).
+    """
+    asyncio.run(run_worker_async(role, goal, workspace_dir))
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="IACT Independent Worker")
@@ -1,14 +1,99 @@
+import os
 import subprocess
 import pathlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from kernel import self_healing_tool
 
+AUDIT_TIMEOUT = 120
+MAX_OUTPUT_BYTES = 256 * 1024
+
+def _run_capped(cmd: list) -> tuple:
+    """
+    Runs a command with stderr merged into stdout, keeping at most MAX_OUTPUT_BYTES of raw output.
+    Returns (returncode, output_bytes, truncated). Raises subprocess.TimeoutExpired after AUDIT_TIMEOUT.
+    """
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    timed_out = threading.Event()
+
+    def _kill():
+        timed_out.set()
+        process.kill()
+
+    timer = threading.Timer(AUDIT_TIMEOUT, _kill)
+    timer.start()
+    try:
+        output = process.stdout.read(MAX_OUTPUT_BYTES)
+        truncated = False
+        # Drain and discard the rest so the child never blocks on a full pipe
+        while process.stdout.read(64 * 1024):
+            truncated = True
+        returncode = process.wait()
+    finally:
+        timer.cancel()
+        process.stdout.close()
+
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, AUDIT_TIMEOUT)
+    return returncode, output, truncated
+
+def _decode_output(output: bytes, truncated: bool) -> str:
+    text = output.decode("utf-8", errors="replace")
+    if truncated:
+        text += f"\n[... output truncated after {MAX_OUTPUT_BYTES // 1024} KiB ...]"
+    return text
+
+def _detect_languages(target_path: pathlib.Path) -> tuple:
+    """Walks the tree once and reports whether it contains Dart and/or Python files."""
+    if target_path.is_file():
+        return target_path.suffix == ".dart", target_path.suffix == ".py"
+
+    has_dart, has_py = False, False
+    for _, _, files in os.walk(target_path):
+        for f in files:
+            if f.endswith(".dart"):
+                has_dart = True
+            elif f.endswith(".py"):
+                has_py = True
+        if has_dart and has_py:
+            break
+    return has_dart, has_py
+
+def _run_dart_analyze(target_path: pathlib.Path, code_path: str) -> tuple:
+    """Returns (failed, report) for `dart analyze`."""
+    print(f"[Audit] Running 'dart analyze' on {code_path}...")
+    try:
+        returncode, output, truncated = _run_capped(["dart", "analyze", str(target_path)])
+    except FileNotFoundError:
+        return False, "[Audit Warning] 'dart' command not found. Skipping Dart analysis."
+    except subprocess.TimeoutExpired:
+        return True, f"Dart Analyze Errors:\n'dart analyze' timed out after {AUDIT_TIMEOUT}s."
+
+    if returncode != 0:
+        return True, f"Dart Analyze Errors:\n{_decode_output(output, truncated)}"
+    return False, "Dart Analyze Passed."
+
+def _run_bandit(target_path: pathlib.Path, code_path: str) -> tuple:
+    """Returns (failed, report) for `bandit`."""
+    print(f"[Audit] Running 'bandit' on {code_path}...")
+    try:
+        returncode, output, truncated = _run_capped(["bandit", "-r", str(target_path), "-ll", "-ii"]) # Only Medium/High severity
+    except FileNotFoundError:
+        return False, "[Audit Warning] 'bandit' command not found. Skipping Python analysis. (Run `pip install bandit`)"
+    except subprocess.TimeoutExpired:
+        return True, f"Bandit Security Errors:\n'bandit' timed out after {AUDIT_TIMEOUT}s."
+
+    if returncode != 0:
+        return True, f"Bandit Security Errors:\n{_decode_output(output, truncated)}"
+    return False, "Bandit Security Passed."
+
 @self_healing_tool
 def run_security_audit(code_path: str) -> str:
     """
     Runs static analysis on the provided code path to check for hardcoded secrets or insecure functions.
     Supports Dart/Flutter (`dart analyze`) and Python (`bandit`).
     If the audit fails, the agent is forbidden from deploying or showing the user the result until fixed.
-    
+
     Args:
         code_path: The directory or file path to analyze.
     """
@@ -16,53 +101,27 @@ def run_security_audit(code_path: str) -> str:
     if not target_path.exists():
         return f"[Audit Failed] Path does not exist: {code_path}"
 
-    results = []
-    has_errors = False
-
-    # Check for Dart/Flutter projects
-    if list(target_path.rglob("*.dart")):
-        print(f"[Audit] Running 'dart analyze' on {code_path}...")
-        try:
-            # Run dart analyze
-            process = subprocess.run(
-                ["dart", "analyze", str(target_path)],
-                capture_output=True,
-                text=True
-            )
-            
-            if process.returncode != 0:
-                has_errors = True
-                results.append(f"Dart Analyze Errors:\n{process.stdout}\n{process.stderr}")
-            else:
-                results.append("Dart Analyze Passed.")
-        except FileNotFoundError:
-            results.append("[Audit Warning] 'dart' command not found. Skipping Dart analysis.")
-
-    # Check for Python projects
-    if list(target_path.rglob("*.py")):
-        print(f"[Audit] Running 'bandit' on {code_path}...")
-        try:
-            # Run bandit
-            process = subprocess.run(
-                ["bandit", "-r", str(target_path), "-ll", "-ii"], # Only Medium/High severity
-                capture_output=True,
-                text=True
-            )
-            
-            if process.returncode != 0:
-                has_errors = True
-                results.append(f"Bandit Security Errors:\n{process.stdout}\n{process.stderr}")
-            else:
-                results.append("Bandit Security Passed.")
-        except FileNotFoundError:
-            results.append("[Audit Warning] 'bandit' command not found. Skipping Python analysis. (Run `pip install bandit`)")
-
-    if not results:
+    has_dart, has_py = _detect_languages(target_path)
+    checks = []
+    if has_dart:
+        checks.append(("dart", _run_dart_analyze))
+    if has_py:
+        checks.append(("bandit", _run_bandit))
+
+    if not checks:
         return f"[Audit Warning] No Dart or Python files found in {code_path}."
 
-    final_report = "\n\n".join(results)
-    
+    # Both analyzers are independent subprocesses, so run them side by side
+    outcomes = {}
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = {executor.submit(check, target_path, code_path): name for name, check in checks}
+        for future in as_completed(futures):
+            outcomes[futures[future]] = future.result()
+
+    has_errors = any(outcomes[name][0] for name, _ in checks)
+    final_report = "\n\n".join(outcomes[name][1] for name, _ in checks)
+
     if has_errors:
         return f"AUDIT FAILED! You are forbidden from deploying or showing the user the result until these issues are fixed:\n\n{final_report}"
-    
+
     return f"AUDIT PASSED. Code is secure.\n\n{final_report}"
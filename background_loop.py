@@ -0,0 +1,20 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Coroutine, Any
+
+_loop = None
+_loop_lock = threading.Lock()
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """Returns the shared background event loop, starting it on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="swarm2-event-loop", daemon=True).start()
+    return _loop
+
+def submit(coro: Coroutine[Any, Any, Any]) -> Future:
+    """Schedules a coroutine as a task on the shared loop and returns a thread-safe Future for it."""
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
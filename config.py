@@ -0,0 +1,33 @@
+import os
+import functools
+from dataclasses import dataclass
+from dotenv import load_dotenv
+
+@dataclass(frozen=True)
+class Settings:
+    """Process-wide configuration, read from the environment (and .env) once."""
+    main_model: str
+    light_model: str
+    embedding_model: str
+    # UI lessons and the agent response cache
+    lancedb_uri: str
+    # The MasterAgent/worker shared knowledge base
+    knowledge_uri: str
+    # IVF partitions probed per ANN query; raise for recall, lower for latency
+    ann_nprobes: int
+    # Warm the UI lessons embedder in the background at import (SWARM2_WARM_EMBEDDER=1)
+    warm_embedder: bool
+
+@functools.lru_cache(maxsize=1)
+def settings() -> Settings:
+    """Loads .env exactly once and snapshots the settings every module reads."""
+    load_dotenv()
+    return Settings(
+        main_model=os.getenv("MAIN_MODEL", "gemini-3.1-pro-preview"),
+        light_model=os.getenv("LIGHT_MODEL", "gemini-2.5-flash"),
+        embedding_model=os.getenv("EMBEDDING_MODEL", "text-embedding-3-small"),
+        lancedb_uri=os.getenv("LANCEDB_URI", "./workspaces/db/lancedb"),
+        knowledge_uri=os.getenv("KNOWLEDGE_URI", "tmp/lancedb"),
+        ann_nprobes=int(os.getenv("ANN_NPROBES", "20")),
+        warm_embedder=os.getenv("SWARM2_WARM_EMBEDDER") == "1",
+    )
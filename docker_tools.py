@@ -1,36 +1,120 @@
 from python_on_whales import docker
 from python_on_whales.exceptions import DockerException
-import uuid
+import os
+import queue
+import itertools
+import atexit
+import threading
 from security import requires_permission
 
+POOL_SIZE = 2
+POOL_WORKDIR = "/tmp/work"
+
+# Ephemeral container names are unique per process without touching /dev/urandom
+_sandbox_counter = itertools.count()
+
 class SandboxedExecutor:
     """
     Executes Python code or shell commands strictly within an isolated Docker container.
     Defaults to no network access for ultimate security.
+    Network-less executions reuse a small pool of long-lived containers via `docker exec`;
+    executions that need the network still get a fresh, throwaway container.
     """
-    
-    def __init__(self, image: str = "python:3.11-slim"):
+
+    def __init__(self, image: str = "python:3.11-slim", pool_size: int = POOL_SIZE):
         self.image = image
-        
+        self.pool_size = pool_size
+        self._pool: "queue.Queue" = queue.Queue()
+        self._pool_containers = []
+        self._pool_lock = threading.Lock()
+
+    def _start_pool_container(self):
+        return docker.run(
+            self.image,
+            ["sh", "-c", "tail -f /dev/null"],
+            name=f"sandbox_pool_{os.getpid()}_{next(_sandbox_counter):06d}",
+            detach=True,
+            remove=True,
+            networks=["none"]
+        )
+
+    def _is_alive(self, container) -> bool:
+        try:
+            container.reload()
+            return container.state.running
+        except DockerException:
+            # Already removed (remove=True) after its main process died
+            return False
+
+    def _replace_dead(self, container):
+        """Swaps a pool container that died (e.g. `kill 1` or OOM in user code) for a fresh one."""
+        print(f"[Sandbox] Pooled container '{container.name}' died; starting a replacement.")
+        try:
+            docker.remove(container, force=True)
+        except DockerException:
+            pass
+        replacement = self._start_pool_container()
+        with self._pool_lock:
+            self._pool_containers = [c for c in self._pool_containers if c is not container] + [replacement]
+        return replacement
+
+    def _ensure_pool(self):
+        """Starts the warm, network-less pool containers on first use."""
+        with self._pool_lock:
+            if self._pool_containers:
+                return
+            for _ in range(self.pool_size):
+                container = self._start_pool_container()
+                self._pool_containers.append(container)
+                self._pool.put(container)
+            print(f"[Sandbox] Started {self.pool_size} pooled container(s) (Network: none)")
+            atexit.register(self.shutdown)
+
+    def shutdown(self):
+        """Stops and removes the pooled containers."""
+        with self._pool_lock:
+            if not self._pool_containers:
+                return
+            try:
+                docker.remove(self._pool_containers, force=True)
+            except DockerException as e:
+                print(f"[Sandbox] Failed to remove pooled containers: {e}")
+            self._pool_containers = []
+            self._pool = queue.Queue()
+
+    def _run_pooled(self, command: list) -> str:
+        self._ensure_pool()
+        container = self._pool.get()
+        try:
+            print(f"[Sandbox] Executing in pooled container '{container.name}' (Network: none)")
+            # Reset the scratch directory so nothing leaks between executions
+            docker.execute(container, ["sh", "-c", f"rm -rf {POOL_WORKDIR} && mkdir -p {POOL_WORKDIR}"])
+            return docker.execute(container, command, workdir=POOL_WORKDIR)
+        finally:
+            if not self._is_alive(container):
+                container = self._replace_dead(container)
+            self._pool.put(container)
+
+    def _run_ephemeral(self, command: list, network_mode: str) -> str:
+        container_name = f"sandbox_{os.getpid()}_{next(_sandbox_counter):06d}"
+        print(f"[Sandbox] Starting container '{container_name}' (Network: {network_mode})")
+        return docker.run(
+            self.image,
+            command,
+            name=container_name,
+            remove=True,
+            networks=[network_mode]
+        )
+
     def _run_in_container(self, command: list, require_network: bool) -> str:
-        network_mode = "bridge" if require_network else "none"
-        container_name = f"sandbox_{uuid.uuid4().hex[:8]}"
-        
         try:
-            print(f"[Sandbox] Starting container '{container_name}' (Network: {network_mode})")
-            
-            # Using inline execution rather than keeping a long-lived container for simplicity
-            # For complex apps, we'd mount volumes. Here, we execute right inside the container.
-            output = docker.run(
-                self.image,
-                command,
-                name=container_name,
-                remove=True,
-                networks=[network_mode] if network_mode != "none" else [],
-                network_mode=network_mode if network_mode == "none" else None
-            )
+            # The pool is pinned to network "none", so networked runs get their own container
+            if require_network:
+                output = self._run_ephemeral(command, "bridge")
+            else:
+                output = self._run_pooled(command)
             return f"Execution successful:\n{output}"
-            
+
         except DockerException as e:
             return f"Sandbox execution failed: {e.stderr if hasattr(e, 'stderr') else str(e)}"
         except Exception as e:
@@ -0,0 +1,90 @@
+import os
+import hashlib
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from agno.knowledge.embedder.google import GeminiEmbedder
+
+from query_cache import QueryCache
+
+# Hot vectors stay in memory so back-to-back identical texts never touch disk
+_memory_cache = QueryCache(maxsize=1024, ttl=None)
+
+@dataclass
+class CachedGeminiEmbedder(GeminiEmbedder):
+    """
+    GeminiEmbedder that caches embeddings by sha256(model id + dimensions + task type + text), in memory for hot keys
+    and as .npy files under cache_dir, so repeated texts never cross the network.
+    """
+    cache_dir: str = "./workspaces/db/embed_cache"
+
+    def _cache_key(self, text: str) -> str:
+        # Anything that changes the returned vector must be part of the key
+        prefix = f"{self.id}\x00{self.dimensions}\x00{self.task_type}\x00"
+        return hashlib.sha256((prefix + text).encode("utf-8")).hexdigest()
+
+    def _lookup(self, key: str) -> Optional[List[float]]:
+        vector = _memory_cache.get(key)
+        if vector is not None:
+            return vector
+
+        path = os.path.join(self.cache_dir, f"{key}.npy")
+        if not os.path.exists(path):
+            return None
+        vector = np.load(path, mmap_mode="r").tolist()
+        _memory_cache.set(key, vector)
+        return vector
+
+    def _store(self, key: str, vector: List[float]):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = os.path.join(self.cache_dir, f"{key}.npy")
+        # Unique temp file: other threads/processes may be storing the same key right now
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f"{key}.", suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, np.asarray(vector, dtype=np.float32))
+        os.replace(tmp_path, path)
+        _memory_cache.set(key, vector)
+
+    def get_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        """Embeds several texts, answering cached ones locally and the rest with a single embed_content call."""
+        keys = [self._cache_key(text) for text in texts]
+        vectors = [self._lookup(key) for key in keys]
+        misses = [i for i, vector in enumerate(vectors) if vector is None]
+        if misses:
+            # _response builds the same request as single embeddings; contents also accepts a list
+            response = self._response([texts[i] for i in misses])
+            for i, embedding in zip(misses, response.embeddings or []):
+                if embedding.values:
+                    vectors[i] = embedding.values
+                    self._store(keys[i], embedding.values)
+        return [vector or [] for vector in vectors]
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        key = self._cache_key(text)
+        vector = self._lookup(key)
+        if vector is not None:
+            return vector, None
+
+        vector, usage = super().get_embedding_and_usage(text)
+        if vector:
+            self._store(key, vector)
+        return vector, usage
+
+    def get_embedding(self, text: str) -> List[float]:
+        return self.get_embedding_and_usage(text)[0]
+
+    async def async_get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        key = self._cache_key(text)
+        vector = self._lookup(key)
+        if vector is not None:
+            return vector, None
+
+        vector, usage = await super().async_get_embedding_and_usage(text)
+        if vector:
+            self._store(key, vector)
+        return vector, usage
+
+    async def async_get_embedding(self, text: str) -> List[float]:
+        return (await self.async_get_embedding_and_usage(text))[0]
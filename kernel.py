@@ -1,11 +1,14 @@
 import os
 import uuid
+import asyncio
 import json
-import subprocess
 import functools
 import pathlib
 import re
-from typing import Dict, Any
+import glob
+import itertools
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
 
 from agno.agent import Agent
 from agno.models.google import Gemini
@@ -15,48 +18,112 @@ from agno.knowledge.embedder.openai import OpenAIEmbedder
 from agno.knowledge.document.base import Document
 from ddgs import DDGS
 from security import requires_permission, get_credential
-from dotenv import load_dotenv
+from query_cache import QueryCache
+from lance_index import ann_nprobes
+from lesson_store import LessonBatcher
+from config import settings
 
-load_dotenv()
+_THINK_RE = re.compile(r'<think>.*?</think>', re.DOTALL)
+_FENCE_RE = re.compile(r'```(?:json)?')
+_SAFE_FN_RE = re.compile(r'[^A-Za-z0-9 _-]+')
 
 # Universal Toolset & Self-Healing
 
+# Shared healer; per-failure context goes in the prompt so no Agent is built per retry
+_HEALER_MODEL = Gemini(id=settings().light_model)
+_HEALER = Agent(
+    model=_HEALER_MODEL,
+    instructions=[
+        "You fix the keyword arguments of failed tool calls.",
+        "Based on the error, fix the arguments to resolve the issue.",
+        "Return ONLY a valid JSON dictionary containing the corrected keyword arguments. Do NOT add markdown blocks or <think> tags."
+    ]
+)
+
+# Directories searched for a missing file before falling back to the LLM healer
+_HEAL_SEARCH_DIRS = ("workspaces", "workspace")
+
+def _is_unrecoverable(error: Exception, kwargs: Dict[str, Any]) -> bool:
+    """Errors that no change of arguments will fix, so retrying them only wastes a healer call."""
+    if isinstance(error, (PermissionError, NotADirectoryError)):
+        return True
+    if isinstance(error, FileNotFoundError):
+        return any(isinstance(v, str) and ".." in v for v in kwargs.values())
+    return False
+
+def _deterministic_fix(error: Exception, kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Returns rule-based corrected kwargs for errors that don't need an LLM, or None to fall through to the healer."""
+    if not isinstance(error, FileNotFoundError):
+        return None
+    
+    # A missing file is usually a wrong directory: look for the same file name in the workspaces
+    for key, value in kwargs.items():
+        if not key.endswith("path") or not isinstance(value, str):
+            continue
+        name = os.path.basename(value)
+        if not name:
+            continue
+        matches = []
+        for search_dir in _HEAL_SEARCH_DIRS:
+            root = pathlib.Path(search_dir)
+            if root.is_dir():
+                matches.extend(itertools.islice(root.rglob(glob.escape(name)), 2 - len(matches)))
+            if len(matches) > 1:
+                break
+        # Common names (main.dart, result.json) exist in many workspaces; only an unambiguous match is safe
+        if len(matches) == 1 and str(matches[0]) != value:
+            return {**kwargs, key: str(matches[0])}
+    return None
+
 def self_healing_tool(func):
     """
     Decorator that catches tool failures and asks a Gemini model to correct the arguments.
-    It retries up to 3 times before giving up.
+    It retries up to 3 times before giving up. Non-recoverable errors are returned immediately,
+    and errors with a rule-based fix are retried without calling the model.
     """
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         attempts = 3
         current_kwargs = kwargs.copy()
         last_error = ""
+        # Rule-based substitutions, reported back so the agent knows which arguments were actually used
+        notes = []
 
         for attempt in range(attempts):
             try:
-                return func(*args, **current_kwargs)
+                result = func(*args, **current_kwargs)
+                if notes and isinstance(result, str):
+                    return "\n".join(notes) + "\n" + result
+                return result
             except Exception as e:
                 last_error = str(e)
+                if _is_unrecoverable(e, current_kwargs):
+                    print(f"[Self-Healing] Tool '{func.__name__}' failed with a non-recoverable error: {e}. Not retrying.")
+                    return f"Tool '{func.__name__}' failed with a non-recoverable error: {last_error}"
+
+                fixed_kwargs = _deterministic_fix(e, current_kwargs)
+                if fixed_kwargs is not None:
+                    notes.extend(
+                        f"[Self-Healing] {k}={current_kwargs.get(k)!r} was not found; used {v!r} instead."
+                        for k, v in fixed_kwargs.items() if current_kwargs.get(k) != v
+                    )
+                    print(f"[Self-Healing] Tool '{func.__name__}' failed: {e}. Attempt {attempt + 1}/{attempts}. Retrying with {fixed_kwargs}.")
+                    current_kwargs = fixed_kwargs
+                    continue
+
                 print(f"[Self-Healing] Tool '{func.__name__}' failed: {e}. Attempt {attempt + 1}/{attempts}. Healing...")
                 
-                # Healer agent
-                healer = Agent(
-                    model=Gemini(id=os.getenv("LIGHT_MODEL", "gemini-2.5-flash")),
-                    instructions=[
-                        f"The tool '{func.__name__}' failed with the following error: {last_error}",
-                        f"The original arguments provided were: {current_kwargs}",
-                        "Based on the error, fix the arguments to resolve the issue.",
-                        "Return ONLY a valid JSON dictionary containing the corrected keyword arguments. Do NOT add markdown blocks or tags."
-                    ]
-                )
-                
                 try:
-                    prompt = "Provide the corrected arguments as a raw JSON object string."
-                    response = healer.run(prompt).content
+                    prompt = (
+                        f"Tool '{func.__name__}' failed: {last_error}\n"
+                        f"Args: {current_kwargs}\n"
+                        "Provide the corrected arguments as a raw JSON object string."
+                    )
+                    response = _HEALER.run(prompt).content
                     
                     # Clean the response to ensure it's pure JSON
-                    clean_resp = response.replace('```json', '').replace('```', '').strip()
-                    clean_resp = re.sub(r'<think>.*?</think>', '', clean_resp, flags=re.DOTALL).strip()
+                    clean_resp = _FENCE_RE.sub('', response).strip()
+                    clean_resp = _THINK_RE.sub('', clean_resp).strip()
                     
                     current_kwargs = json.loads(clean_resp)
                     print(f"[Self-Healing] Extracted corrected kwargs: {current_kwargs}")
@@ -71,68 +138,101 @@ def get_safe_path(file_path: str) -> pathlib.Path:
     """Returns the resolved file path."""
     return pathlib.Path(file_path).resolve()
 
+# Larger files are truncated rather than loaded whole into the agent's context
+MAX_READ_BYTES = 4 * 1024 * 1024
+
 @self_healing_tool
 def read_file(file_path: str) -> str:
     """Reads the contents of a file within the workspaces directory."""
     safe_path = get_safe_path(file_path)
     if not safe_path.exists():
         raise FileNotFoundError(f"File not found: {file_path}")
-    with open(safe_path, "r", encoding="utf-8") as f:
-        return f.read()
+    size = safe_path.stat().st_size
+    if size > MAX_READ_BYTES:
+        with safe_path.open("rb") as f:
+            head = f.read(MAX_READ_BYTES)
+        return head.decode("utf-8", errors="ignore") + f"\n\n[Warning] File truncated: showing the first {MAX_READ_BYTES} of {size} bytes."
+    return safe_path.read_text(encoding="utf-8")
 
 @self_healing_tool
 def write_file(file_path: str, content: str) -> str:
     """Writes content to a file safely within the workspaces directory."""
     safe_path = get_safe_path(file_path)
     safe_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(safe_path, "w", encoding="utf-8") as f:
-        f.write(content)
+    safe_path.write_text(content, encoding="utf-8")
     return f"File successfully written to {file_path}"
 
+@functools.lru_cache(maxsize=256)
+def _scan_dir_cached(path: str, mtime_ns: int) -> str:
+    # mtime_ns is part of the cache key: adding or removing an entry bumps it and forces a rescan
+    with os.scandir(path) as it:
+        return json.dumps([entry.name for entry in it])
+
 @self_healing_tool
 def list_dir(dir_path: str) -> str:
     """Lists the contents of a directory safely within the workspaces directory."""
     safe_path = get_safe_path(dir_path)
+    if not safe_path.exists():
+        # Recoverable: a mistyped path can still be healed
+        raise FileNotFoundError(f"Directory not found: {dir_path}")
     if not safe_path.is_dir():
         raise NotADirectoryError(f"Not a directory: {dir_path}")
-    return json.dumps(os.listdir(safe_path))
+    return _scan_dir_cached(str(safe_path), safe_path.stat().st_mtime_ns)
 
-@self_healing_tool
-def research_topic(query: str) -> str:
-    """Searches the web for a given query, summarizes top results via Gemini, and saves to a file in workspaces/knowledge."""
+# Max summarizer calls in flight at once, to stay within Gemini rate limits
+RESEARCH_CONCURRENCY = 4
+
+async def _research_one(query: str, semaphore: asyncio.Semaphore) -> str:
     print(f"[Deep Research] Searching for: {query}")
-    results = DDGS().text(query, max_results=3)
+    results = await asyncio.to_thread(DDGS().text, query, max_results=3)
     if not results:
         return f"No results found for {query}"
     
     combined_text = "\n\n".join([f"Title: {r.get('title')}\nSnippet: {r.get('body')}\nLink: {r.get('href')}" for r in results])
     
     summarizer = Agent(
-        model=Gemini(id=os.getenv("LIGHT_MODEL", "gemini-2.5-flash")),
+        model=Gemini(id=settings().light_model),
         description="You are a research summarizer.",
         instructions=["Summarize the provided text comprehensively, extracting key facts. Do NOT include <think> tags."]
     )
-    summary_resp = summarizer.run(combined_text).content
-    summary_clean = re.sub(r'<think>.*?</think>', '', summary_resp, flags=re.DOTALL).strip()
+    async with semaphore:
+        summary_resp = (await summarizer.arun(combined_text)).content
+    summary_clean = _THINK_RE.sub('', summary_resp).strip()
     
     # Save the summary to workspaces/knowledge
     safe_dir = get_safe_path("workspaces/knowledge")
     safe_dir.mkdir(parents=True, exist_ok=True)
     
-    # Make a safe filename
-    safe_filename = "".join(x for x in query if x.isalnum() or x in " _-").strip() + ".txt"
-    with open(safe_dir / safe_filename, "w", encoding="utf-8") as f:
-        f.write(summary_clean)
+    # Make a safe filename, truncated well below the 255-byte NAME_MAX
+    safe_filename = _SAFE_FN_RE.sub('', query).strip()[:120] + ".txt"
+    await asyncio.to_thread((safe_dir / safe_filename).write_text, summary_clean, encoding="utf-8")
         
     return f"Research on '{query}' complete. Summary saved to workspaces/knowledge/{safe_filename}."
 
+async def research_topics(queries: List[str]) -> List[str]:
+    """Researches several queries concurrently, overlapping their web searches, summaries and file writes.
+    
+    Args:
+        queries: The queries to research.
+        
+    Returns:
+        One status message per query, in the same order.
+    """
+    semaphore = asyncio.Semaphore(RESEARCH_CONCURRENCY)
+    return await asyncio.gather(*[_research_one(query, semaphore) for query in queries])
+
+@self_healing_tool
+def research_topic(query: str) -> str:
+    """Searches the web for a given query, summarizes top results via Gemini, and saves to a file in workspaces/knowledge."""
+    return asyncio.run(research_topics([query]))[0]
+
 
 
 # The "Body": A helper agent/sub-agent for summarizing text and filtering logs
 summary_agent = Agent(
     name="SummaryAgent",
     role="Text summarizer and log filter",
-    model=Gemini(id=os.getenv("LIGHT_MODEL", "gemini-2.5-flash")),
+    model=Gemini(id=settings().light_model),
     description="You are a helper agent responsible for summarizing text and filtering logs.",
     instructions=[
         "Provide concise, accurate summaries of the provided text.",
@@ -145,20 +245,57 @@ summary_agent = Agent(
 knowledge_base = Knowledge(
     vector_db=LanceDb(
         table_name="soae_knowledge",
-        uri="tmp/lancedb",
-        embedder=OpenAIEmbedder(id=os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")),
+        uri=settings().knowledge_uri,
+        embedder=OpenAIEmbedder(id=settings().embedding_model),
+        nprobes=ann_nprobes(),
     ),
 )
 
+# Memoizes knowledge_base.search for repeated queries; cleared whenever new knowledge is inserted
+_query_cache = QueryCache(maxsize=128, ttl=300)
+
+def _cached_search(query: str, max_results: int = 5) -> list:
+    """Runs knowledge_base.search, skipping the embedding call and ANN scan on a cache hit."""
+    key = QueryCache.make_key(query, max_results)
+    results = _query_cache.get(key)
+    if results is None:
+        results = knowledge_base.search(query, max_results=max_results)
+        _query_cache.set(key, results)
+    return results
+
+def _embed_batch(texts: List[str]) -> List[List[float]]:
+    """Embeds several texts with a single OpenAI embeddings request."""
+    # response() builds the same request as the embedder's own calls (dimensions, encoding_format,
+    # request_params), so batch vectors are comparable with the stored ones; the API accepts a list input
+    response = knowledge_base.vector_db.embedder.response(texts)
+    return [item.embedding for item in response.data]
+
+# Lessons waiting to be embedded and written to LanceDB together
+_lessons = LessonBatcher(
+    "Knowledge",
+    get_vector_db=lambda: knowledge_base.vector_db,
+    embed_batch=_embed_batch,
+    batch_size=16,
+    flush_interval=0.25,
+    # Rebuild the ANN index after this many new rows so partitions track the data
+    reindex_every=512,
+    on_flush=_query_cache.clear,
+)
+
 
 # IACT Master Tools
 from docker_tools import SandboxedExecutor
-from screenshot_tool import capture_app_screenshot
+from screenshot_tool import capture_app_screenshot, capture_app_screenshots
 from qa_agent import analyze_ui_screenshot
+from agents.worker import run_worker_async
+import background_loop
+
+# worker_id -> Future of the in-process worker task running on the shared event loop
+_worker_tasks: Dict[str, Future] = {}
 
-@requires_permission
+@requires_permission(batch=True)
 def spawn_worker(role: str, goal: str) -> str:
-    """Spawns an independent worker process to perform a task.
+    """Spawns an independent worker task on the shared event loop to perform a task.
     
     Args:
         role: The role or persona of the worker.
@@ -171,19 +308,103 @@ def spawn_worker(role: str, goal: str) -> str:
     workspace_dir = os.path.abspath(f"./workspaces/{worker_id}")
     os.makedirs(workspace_dir, exist_ok=True)
     
-    # Launch worker in background without waiting
-    cmd = [
-        "uv", "run", "python", "agents/worker.py",
-        "--role", role,
-        "--goal", goal,
-        "--workspace_dir", workspace_dir
-    ]
-    
-    subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # Launch worker in background without waiting; it shares this process's knowledge base
+    _worker_tasks[worker_id] = background_loop.submit(
+        run_worker_async(role, goal, workspace_dir, knowledge_base=knowledge_base)
+    )
     return f"Worker Started. ID: {worker_id}. Check status later with check_worker_status."
 
+WORKSPACES_DIR = "./workspaces"
+
+# worker_id -> (result.json mtime_ns, rendered status), so unchanged results are not re-parsed
+_worker_result_cache: Dict[str, tuple] = {}
+
+def _is_worker_id(name: str) -> bool:
+    try:
+        uuid.UUID(name)
+        return True
+    except ValueError:
+        return False
+
+def _format_worker_result(worker_id: str, data: dict) -> str:
+    return f"Worker {worker_id} completed. Result:\n{json.dumps(data, indent=2)}"
+
+def _read_worker_result(worker_id: str, result_file: str) -> str:
+    # Workers publish result.json with an atomic rename, but older or hand-edited files may still be
+    # corrupt; report that worker's error instead of failing the whole batch
+    try:
+        with open(result_file, "rb") as f:
+            data = json.loads(f.read())
+        return _format_worker_result(worker_id, data)
+    except Exception as e:
+        return f"Error reading result for worker {worker_id}: {e}"
+
+def check_workers_status(worker_ids: Optional[List[str]] = None) -> Dict[str, str]:
+    """Checks the status of several independent workers in a single pass.
+    In-process worker tasks are checked directly; result.json files are only read
+    for workers that run in their own process.
+    
+    Args:
+        worker_ids: The IDs of the workers to check. If omitted, every worker under ./workspaces is checked.
+        
+    Returns:
+        A mapping of worker ID to its result, or a message indicating it's still running.
+    """
+    worker_dirs = {}
+    if os.path.isdir(WORKSPACES_DIR):
+        with os.scandir(WORKSPACES_DIR) as it:
+            for entry in it:
+                if entry.is_dir() and _is_worker_id(entry.name):
+                    worker_dirs[entry.name] = entry.path
+    
+    if worker_ids is None:
+        worker_ids = list(dict.fromkeys([*_worker_tasks, *worker_dirs]))
+    
+    statuses = {}
+    pending_reads = {}
+    for worker_id in worker_ids:
+        task = _worker_tasks.get(worker_id)
+        if task is not None:
+            if not task.done():
+                statuses[worker_id] = f"Worker {worker_id} is still running. No result found yet."
+            elif task.exception() is not None:
+                statuses[worker_id] = f"Worker {worker_id} failed: {task.exception()}"
+            else:
+                statuses[worker_id] = _format_worker_result(worker_id, task.result())
+            continue
+        
+        result_file = os.path.join(worker_dirs.get(worker_id, os.path.join(WORKSPACES_DIR, worker_id)), "result.json")
+        try:
+            mtime_ns = os.stat(result_file).st_mtime_ns
+        except OSError:
+            statuses[worker_id] = f"Worker {worker_id} is still running or failed. No result found yet."
+            continue
+        
+        cached = _worker_result_cache.get(worker_id)
+        if cached and cached[0] == mtime_ns:
+            statuses[worker_id] = cached[1]
+        else:
+            pending_reads[worker_id] = (result_file, mtime_ns)
+    
+    if len(pending_reads) == 1:
+        # Not worth a thread pool for a single file
+        worker_id, (result_file, _) = next(iter(pending_reads.items()))
+        statuses[worker_id] = _read_worker_result(worker_id, result_file)
+    elif pending_reads:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = {
+                worker_id: executor.submit(_read_worker_result, worker_id, result_file)
+                for worker_id, (result_file, _) in pending_reads.items()
+            }
+        for worker_id, future in futures.items():
+            statuses[worker_id] = future.result()
+    for worker_id, (_, mtime_ns) in pending_reads.items():
+        _worker_result_cache[worker_id] = (mtime_ns, statuses[worker_id])
+    
+    return {worker_id: statuses[worker_id] for worker_id in worker_ids}
+
 def check_worker_status(worker_id: str) -> str:
-    """Checks the status of an independent worker process.
+    """Checks the status of an independent worker.
     
     Args:
         worker_id: The ID of the worker to check.
@@ -191,16 +412,7 @@ def check_worker_status(worker_id: str) -> str:
     Returns:
         The result of the worker's task, or a message indicating it's still running.
     """
-    result_file = f"./workspaces/{worker_id}/result.json"
-    if os.path.exists(result_file):
-        try:
-            with open(result_file, "r") as f:
-                data = json.load(f)
-            return f"Worker {worker_id} completed. Result:\n{json.dumps(data, indent=2)}"
-        except Exception as e:
-            return f"Error reading result for worker {worker_id}: {e}"
-    else:
-        return f"Worker {worker_id} is still running or failed. No result found yet."
+    return check_workers_status([worker_id])[worker_id]
 
 sandbox = SandboxedExecutor()
 
@@ -231,17 +443,21 @@ def save_ui_lesson(problem: str, solution: str, context: str = "Flutter") -> str
     }
     lesson_text = json.dumps(lesson_data)
     
-    # Store as LanceDB knowledge
-    knowledge_base.insert(text_content=lesson_text, metadata={"type": "ui_lesson", "context": context})
+    # Queue for the next batched LanceDB insert
+    _lessons.put(Document(content=lesson_text, meta_data={"type": "ui_lesson", "context": context}))
     
     return f"Lesson successfully saved to Knowledge Base: {lesson_text}"
 
+def _ui_lesson_query(context: str) -> str:
+    return f"{context} UI layout alignment color issues"
+
 @self_healing_tool
 def query_ui_lessons(context: str = "Flutter") -> str:
     """
     Queries LanceDB for past UI/UX lessons. The agent MUST call this before writing new frontend code.
     """
-    results = knowledge_base.search(f"{context} UI layout alignment color issues", num_documents=5)
+    _lessons.flush_quietly()
+    results = _cached_search(_ui_lesson_query(context), max_results=5)
     if not results:
         return f"No past UI lessons found for context: {context}."
     
@@ -251,6 +467,32 @@ def query_ui_lessons(context: str = "Flutter") -> str:
         
     return "Past UI lessons to keep in mind:\n" + "\n".join(lessons)
 
+@self_healing_tool
+def query_ui_lessons_batch(contexts: List[str]) -> str:
+    """
+    Queries LanceDB for past UI/UX lessons for several contexts at once (e.g. ["Flutter", "React", "iOS"]).
+    All queries are embedded in one request and answered by a single multi-vector search.
+    """
+    _lessons.flush_quietly()
+    contexts = list(dict.fromkeys(contexts))
+    grouped: Dict[str, List[str]] = {context: [] for context in contexts}
+    
+    vector_db = knowledge_base.vector_db
+    if contexts and vector_db.exists():
+        vectors = _embed_batch([_ui_lesson_query(context) for context in contexts])
+        rows = vector_db.table.search(vectors).distance_type("cosine").nprobes(ann_nprobes()).limit(5).to_list()
+        # Multi-vector searches tag each row with the index of the query vector it matched
+        for row in rows:
+            grouped[contexts[row.get("query_index", 0)]].append(json.loads(row["payload"])["content"])
+    
+    sections = []
+    for context, lessons in grouped.items():
+        if lessons:
+            sections.append(f"[{context}]\n" + "\n".join(lessons))
+        else:
+            sections.append(f"[{context}]\nNo past UI lessons found for context: {context}.")
+    return "Past UI lessons to keep in mind:\n" + "\n\n".join(sections)
+
 class MasterAgent(Agent):
     """
     The "Brain": High-level planning and reasoning agent of the SOAE.
@@ -260,7 +502,7 @@ class MasterAgent(Agent):
         super().__init__(
             name="MasterAgent",
             role="Self-Organizing Autonomous Entity (SOAE) Kernel",
-            model=Gemini(id=os.getenv("MAIN_MODEL", "gemini-3.1-pro-preview")),
+            model=Gemini(id=settings().main_model),
             description="You are the Master Agent (The Brain) of a Self-Organizing Autonomous Entity.",
             db=SqliteDb(session_table="master_agent_sessions", db_file="storage.db"),
             num_history_messages=10,
@@ -268,28 +510,32 @@ class MasterAgent(Agent):
             search_knowledge=True,
             read_chat_history=True,
             tools=[
-                spawn_worker, check_worker_status, list_dir, read_file, write_file, 
+                spawn_worker, check_worker_status, check_workers_status, list_dir, read_file, write_file, 
                 research_topic, get_credential, execute_python_code, execute_shell_command,
-                capture_app_screenshot, analyze_ui_screenshot, save_ui_lesson, query_ui_lessons
+                capture_app_screenshot, capture_app_screenshots, analyze_ui_screenshot, save_ui_lesson, query_ui_lessons,
+                query_ui_lessons_batch
             ],
             instructions=[
                 "You are the high-level planner and orchestrator.",
                 "Delegate any and all text summarization or log filtering tasks to your SummaryAgent to save costs and optimize processing.",
                 "Remember user context across sessions to maintain continuity.",
-                "Before writing frontend or UI code, YOU MUST call the query_ui_lessons tool to query past UI lessons and avoid previous mistakes.",
+                "Before writing frontend or UI code, YOU MUST call the query_ui_lessons tool to query past UI lessons and avoid previous mistakes. When the work spans several contexts (e.g. Flutter and React), call query_ui_lessons_batch once with all of them instead.",
                 "Use spawn_worker to delegate complex tasks asynchronously to independent Gemini workers.",
-                "Use check_worker_status periodically to retrieve results of spawned workers.",
+                "Use check_worker_status periodically to retrieve results of spawned workers, or check_workers_status to poll many workers at once.",
                 "Use the Universal Toolset (read_file, write_file, list_dir) to safely manipulate files in your sandboxed workspace directory.",
                 "Use the research_topic tool to run Deep Research loops, summarizing findings from the web directly into your knowledge base.",
                 "Use execute_python_code and execute_shell_command to safely run code or shell commands isolated in Docker.",
-                "Use get_credential(service_name) prior to executing code requiring external auth to securely fetch user tokens securely without hardcoding them.",
+                "Use get_credential(service_name) prior to executing code requiring external auth to securely fetch user tokens securely without hardcoding them. It returns an opaque cred://<service> handle, never the raw token.",
                 "The system enforces a Human-in-the-Loop policy. If you call write_file, spawn_worker, or request network access in the Sandbox, the user will be prompted to approve.",
-                "Use capture_app_screenshot(url) to take a picture of a running web app.",
+                "Use capture_app_screenshot(url) to take a picture of a running web app, or capture_app_screenshots(urls) to capture several routes in parallel.",
                 "Use analyze_ui_screenshot(image_path) to pass images to your sibling QualityAssuranceAgent for UI critique.",
                 "When you resolve a UI bug based on visual feedback, use save_ui_lesson to persist the {problem, solution, context} to LanceDB so you never make that mistake again."
             ],
             **kwargs
         )
+        
+        # Bootstrap the ANN index on an existing knowledge table (off-thread) so searches don't brute-force scan
+        _lessons.start()
 
 # Example usage (can be removed or moved to main.py later):
 # if __name__ == "__main__":
@@ -0,0 +1,54 @@
+import math
+from typing import Optional
+
+from config import settings
+
+# Below this many rows a brute-force scan is already fast and IVF has too little data to train on
+MIN_ROWS_FOR_INDEX = 256
+# From this many rows on, product quantization pays for its recall loss
+PQ_MIN_ROWS = 1024
+
+def ann_nprobes() -> int:
+    """Number of IVF partitions probed per query; raise for recall, lower for latency."""
+    return settings().ann_nprobes
+
+def has_vector_index(table, vector_column: str = "vector") -> bool:
+    return any(vector_column in index.columns for index in table.list_indices())
+
+def ensure_ann_index(table, vector_column: str = "vector", metric: str = "cosine",
+                     min_rows: int = MIN_ROWS_FOR_INDEX, num_sub_vectors: int = 96,
+                     index_type: Optional[str] = None, replace: bool = False) -> Optional[str]:
+    """
+    Builds an ANN index on a LanceDB table's vector column, sized to the table:
+    IVF_SQ (8-bit scalar quantized) with sqrt(N) partitions for small tables,
+    IVF_PQ with 256 partitions from PQ_MIN_ROWS rows on.
+    Both keep quantized codes in the index, so scans read a fraction of the raw FP32 bytes.
+    Pass index_type to force a specific type (e.g. "IVF_HNSW_SQ") regardless of size.
+    Does nothing when the table has fewer than min_rows rows or is already indexed, unless replace=True.
+    Returns the index type that was built, or None.
+    """
+    num_rows = table.count_rows()
+    if num_rows < min_rows:
+        return None
+    if not replace and has_vector_index(table, vector_column):
+        return None
+
+    if index_type is None:
+        index_type = "IVF_PQ" if num_rows >= PQ_MIN_ROWS else "IVF_SQ"
+
+    options = {}
+    if index_type.endswith("PQ"):
+        options["num_sub_vectors"] = num_sub_vectors
+    if index_type.startswith("IVF_HNSW"):
+        options.update(m=16, ef_construction=64)
+    num_partitions = 256 if index_type == "IVF_PQ" else max(1, int(math.sqrt(num_rows)))
+
+    table.create_index(
+        metric=metric,
+        vector_column_name=vector_column,
+        index_type=index_type,
+        num_partitions=num_partitions,
+        replace=True,
+        **options
+    )
+    return index_type
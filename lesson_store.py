@@ -0,0 +1,144 @@
+import time
+import queue
+import atexit
+import hashlib
+import threading
+from typing import Callable, List, Optional
+
+from agno.knowledge.document.base import Document
+
+from lance_index import ensure_ann_index, MIN_ROWS_FOR_INDEX
+
+class LessonBatcher:
+    """
+    Queues lesson Documents and writes them to a LanceDb vector store from one background thread:
+    a burst of lessons is embedded with a single batch call and stored with a single insert.
+    The table's ANN index is built when the thread starts and rebuilt every `reindex_every` rows.
+    A lesson that keeps failing is dropped after `max_attempts` flushes so it can't block the queue.
+    """
+
+    def __init__(self, name: str, get_vector_db: Callable, embed_batch: Callable[[List[str]], List[List[float]]],
+                 batch_size: int = 16, flush_interval: float = 0.25, reindex_every: int = 512,
+                 index_min_rows: int = MIN_ROWS_FOR_INDEX, index_type: Optional[str] = None,
+                 max_attempts: int = 3, retry_delay: float = 2.0, on_flush: Optional[Callable[[], None]] = None):
+        self.name = name
+        self.get_vector_db = get_vector_db
+        self.embed_batch = embed_batch
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.reindex_every = reindex_every
+        self.index_min_rows = index_min_rows
+        self.index_type = index_type
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.on_flush = on_flush
+        # (document, failed attempts so far)
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._queued = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._thread_lock = threading.Lock()
+        self._thread = None
+        self._rows_since_index = 0
+        atexit.register(self.flush_quietly)
+
+    def put(self, document: Document):
+        """Queues a lesson for the next batched write."""
+        self._queue.put((document, 0))
+        self.start()
+        self._queued.set()
+
+    def start(self):
+        """Starts the background flusher (and the initial index build) once; cheap to call repeatedly."""
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"{self.name}-flusher", daemon=True)
+                self._thread.start()
+
+    def ensure_index(self, replace: bool = False):
+        """Builds (or, with replace=True, rebuilds) the ANN index on the table."""
+        vector_db = self.get_vector_db()
+        if not vector_db.exists():
+            return
+        try:
+            index_type = ensure_ann_index(
+                vector_db.table, min_rows=self.index_min_rows, index_type=self.index_type, replace=replace
+            )
+        except Exception as e:
+            # Another process may be building the same index; the next rebuild will catch up
+            print(f"[{self.name}] Skipped ANN index build: {e}")
+            return
+        if index_type:
+            print(f"[{self.name}] Built {index_type} index.")
+
+    def flush(self) -> int:
+        """
+        Embeds and stores every queued lesson with a single batched insert. Returns the number flushed.
+        On failure the lessons are re-queued (up to max_attempts) and the error is raised.
+        """
+        with self._flush_lock:
+            pending = []
+            while True:
+                try:
+                    pending.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not pending:
+                return 0
+
+            documents = [document for document, _ in pending]
+            try:
+                # One embedding call for the batch; insert skips documents that already carry a vector
+                vector_db = self.get_vector_db()
+                missing = [d for d in documents if not d.embedding]
+                if missing:
+                    for document, embedding in zip(missing, self.embed_batch([d.content for d in missing])):
+                        document.embedding = embedding
+                if not vector_db.exists():
+                    vector_db.create()
+                content_hash = hashlib.md5("\n".join(d.content for d in documents).encode("utf-8")).hexdigest()
+                vector_db.insert(content_hash, documents)
+            except Exception:
+                # These were already reported as saved; keep them for another try unless they keep failing
+                for document, attempts in pending:
+                    if attempts + 1 < self.max_attempts:
+                        self._queue.put((document, attempts + 1))
+                    else:
+                        print(f"[{self.name}] Dropping lesson after {self.max_attempts} failed writes: {document.content[:80]!r}")
+                raise
+
+            if self.on_flush:
+                self.on_flush()
+            self._rows_since_index += len(documents)
+            return len(documents)
+
+    def flush_quietly(self) -> int:
+        """flush() for read paths and shutdown: a failed write is logged, never raised."""
+        try:
+            return self.flush()
+        except Exception as e:
+            print(f"[{self.name}] Failed to flush lessons: {e}")
+            return 0
+
+    def _run(self):
+        # Build the index for an existing table off the caller's thread
+        self.ensure_index()
+        while True:
+            self._queued.wait()
+            # Debounce: give bursts a moment to accumulate unless a full batch is already waiting
+            deadline = time.monotonic() + self.flush_interval
+            while self._queue.qsize() < self.batch_size and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self._queued.clear()
+            try:
+                flushed = self.flush()
+                if flushed:
+                    print(f"[{self.name}] Flushed {flushed} lesson(s) to LanceDB.")
+            except Exception as e:
+                print(f"[{self.name}] Failed to flush lessons: {e}")
+                if not self._queue.empty():
+                    # Retry the re-queued lessons without waiting for an unrelated save
+                    time.sleep(self.retry_delay)
+                    self._queued.set()
+            if self._rows_since_index >= self.reindex_every:
+                self._rows_since_index = 0
+                self.ensure_index(replace=True)
@@ -1,35 +1,124 @@
 import os
 import json
-from dotenv import load_dotenv
+import hashlib
+import pathlib
+import functools
+import threading
 from agno.agent import Agent
+from agno.media import Image
 from agno.models.google import Gemini
 from agno.knowledge import Knowledge
 from agno.vectordb.lancedb import LanceDb
 from agno.knowledge.document.base import Document
 from agno.knowledge.embedder.google import GeminiEmbedder
+from embed_cache import CachedGeminiEmbedder
+from agent_cache import cached_agent_run, SqliteResponseCache
+from config import settings
+from lance_index import ann_nprobes
+from lesson_store import LessonBatcher
 
-load_dotenv()
+# The knowledge base and agent are built on first use so importing this module stays cheap
+@functools.lru_cache(maxsize=1)
+def _kb() -> Knowledge:
+    """UI Learner Knowledge Base."""
+    return Knowledge(
+        vector_db=LanceDb(
+            uri=settings().lancedb_uri,
+            table_name="ui_lessons",
+            embedder=CachedGeminiEmbedder(id=settings().embedding_model),
+            nprobes=ann_nprobes(),
+        )
+    )
+
+def _warm_embedder():
+    """Opens the lessons table and authenticates the embedder before the first critique needs them."""
+    try:
+        vector_db = _kb().vector_db
+        if vector_db.exists():
+            vector_db.table.count_rows()
+        embedder = vector_db.embedder
+        embedder.client
+        # Bypass the embedding cache: a cached "warmup" vector would never touch the network
+        GeminiEmbedder.get_embedding(embedder, "warmup")
+    except Exception:
+        pass
+
+# Opt-in, so CI and one-off processes that never critique a screenshot don't pay for it
+if settings().warm_embedder:
+    threading.Thread(target=_warm_embedder, name="ui-embedder-warmup", daemon=True).start()
 
-# Setup UI Learner Knowledge Base
-ui_learner_kb = Knowledge(
-    vector_db=LanceDb(
-        uri="./workspaces/db/lancedb",
-        table_name="ui_lessons",
-        embedder=GeminiEmbedder(id=os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")),
+@functools.lru_cache(maxsize=1)
+def _qa_agent() -> Agent:
+    """The Visual Feedback Agent."""
+    return Agent(
+        name="QualityAssuranceAgent",
+        role="Senior UI/UX Designer and QA Tester",
+        model=Gemini(id=settings().main_model),
+        description="You are a Senior UI/UX Designer responsible for critiquing application layouts and aesthetics.",
+        instructions=[
+            "You are a Senior UI/UX Designer. Critique the screenshot for alignment, color theory, and usability."
+        ]
     )
-)
 
-# Initialize the Visual Feedback Agent
-qa_agent = Agent(
-    name="QualityAssuranceAgent",
-    role="Senior UI/UX Designer and QA Tester",
-    model=Gemini(id=os.getenv("MAIN_MODEL", "gemini-3.1-pro-preview")),
-    description="You are a Senior UI/UX Designer responsible for critiquing application layouts and aesthetics.",
-    instructions=[
-        "You are a Senior UI/UX Designer. Critique the screenshot for alignment, color theory, and usability."
-    ]
+# Critiques keyed on model id + screenshot sha256 + context: byte-identical re-captures skip the vision call entirely
+QA_CACHE_FILE = "./workspaces/db/qa_cache.db"
+_critique_cache = SqliteResponseCache(QA_CACHE_FILE, max_entries=1000)
+
+# Lessons embedded into each critique prompt
+TOP_K_LESSONS = 3
+
+# Lessons waiting to be embedded and written to LanceDB together
+_lessons = LessonBatcher(
+    "Learner",
+    get_vector_db=lambda: _kb().vector_db,
+    # CachedGeminiEmbedder answers cached texts locally and embeds the rest in one call
+    embed_batch=lambda texts: _kb().vector_db.embedder.get_embeddings_batch(texts),
+    batch_size=32,
+    flush_interval=0.2,
+    # Index only once brute force starts to hurt, and rebuild after this many new lessons;
+    # HNSW over int8 scalar-quantized vectors reads a quarter of the FP32 bytes per comparison
+    index_min_rows=1000,
+    index_type="IVF_HNSW_SQ",
+    reindex_every=256,
 )
 
+def _search_lessons(query: str, context: str, limit: int = TOP_K_LESSONS) -> list:
+    """
+    Vector search over the lessons stored for `context` only; returns their contents.
+    agno keeps meta_data inside the JSON `payload` column, so the context predicate is pushed into
+    LanceDB as a prefilter on that string and then confirmed on the decoded rows.
+    """
+    # Lessons are rarely learned in this process, so the first search bootstraps the ANN index (off-thread)
+    _lessons.start()
+    vector_db = _kb().vector_db
+    if not vector_db.exists():
+        return []
+    # Match json.dumps' own formatting/escaping of the meta_data entry, then quote for SQL
+    needle = json.dumps({"context": context})[1:-1].replace("'", "''")
+    rows = (
+        vector_db.table.search(vector_db.embedder.get_embedding(query))
+        .distance_type("cosine")
+        .nprobes(ann_nprobes())
+        .where(f"payload LIKE '%{needle}%'", prefilter=True)
+        .limit(limit)
+        .to_list()
+    )
+    lessons = []
+    for row in rows:
+        payload = json.loads(row["payload"])
+        if (payload.get("meta_data") or {}).get("context") == context:
+            lessons.append(payload["content"])
+    return lessons
+
+@functools.lru_cache(maxsize=64)
+def _prepare_image(path: str, mtime_ns: int) -> tuple:
+    """
+    Reads a screenshot once and returns (bytes, sha256 hex digest).
+    Keyed on mtime so a re-captured screenshot at the same path is read again.
+    """
+    data = pathlib.Path(path).read_bytes()
+    return data, hashlib.sha256(data).hexdigest()
+
 def learn_ui_lesson(problem: str, solution: str, context: str = "Flutter"):
     """
     Saves a 'Lesson' to the LanceDB knowledge base for future UI generation/fixes.
@@ -46,8 +135,8 @@ def learn_ui_lesson(problem: str, solution: str, context: str = "Flutter"):
         meta_data={"context": context, "type": "ui_lesson"}
     )
     
-    # Add to KB
-    ui_learner_kb.load_documents([doc])
+    # Queue for the next batched insert into the KB
+    _lessons.put(doc)
     print(f"[Learner] Saved UI lesson: {problem} -> {solution}")
 
 def analyze_ui_screenshot(image_path: str, context: str = "Flutter") -> str:
@@ -56,14 +145,29 @@ def analyze_ui_screenshot(image_path: str, context: str = "Flutter") -> str:
     It queries the Learner Knowledge Base beforehand to supply known pitfalls.
     """
     try:
+        image_bytes, image_hash = _prepare_image(image_path, os.stat(image_path).st_mtime_ns)
+        # A different model would critique differently, so its id is part of the key
+        critique_key = f"{settings().main_model}:{image_hash}:{context}"
+        critique = _critique_cache.get(critique_key)
+        if critique is not None:
+            print("[QA] Screenshot unchanged since a previous critique; reusing it.")
+            return critique
+        
+        _lessons.flush_quietly()
+        
         # 1. Query past lessons
-        relevant_lessons = ui_learner_kb.search(f"{context} UI layout alignment color issues", num_documents=3)
+        relevant_lessons = _search_lessons(f"{context} UI layout alignment color issues", context)
         
-        lesson_context = ""
-        if relevant_lessons:
-            lesson_context = "\nHere are relevant previous lessons to keep in mind:\n"
-            for lesson in relevant_lessons:
-                lesson_context += f"- {lesson.content}\n"
+        # Near-identical historical lessons would only inflate the prompt
+        seen = set()
+        parts = []
+        for lesson in relevant_lessons:
+            content_hash = hash(lesson)
+            if content_hash in seen:
+                continue
+            seen.add(content_hash)
+            parts.append(f"- {lesson}")
+        lesson_context = "\nHere are relevant previous lessons to keep in mind:\n" + "\n".join(parts) + "\n" if parts else ""
                 
         # 2. Build prompt
         prompt = (
@@ -72,7 +176,10 @@ def analyze_ui_screenshot(image_path: str, context: str = "Flutter") -> str:
             f"{lesson_context}"
         )
         
-        response = qa_agent.run(prompt, images=[image_path])
-        return response.content
+        image = Image(content=image_bytes, format=pathlib.Path(image_path).suffix.lstrip(".").lower() or None)
+        critique = cached_agent_run(_qa_agent(), prompt, images=[image], exact_keys={"image_hash": image_hash})
+        if critique:
+            _critique_cache.set(critique_key, critique)
+        return critique
     except Exception as e:
         return f"Failed to analyze screenshot: {str(e)}"
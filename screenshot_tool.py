@@ -1,59 +1,243 @@
-from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+import asyncio
 import pathlib
 import subprocess
+from typing import List, Optional
 import time
+import uuid
+import socket
+import atexit
+import threading
+import background_loop
 from security import requires_permission
 from kernel import self_healing_tool
 
+# Captures in flight at once on the shared browser
+MAX_CONCURRENT_CAPTURES = 8
+# Viewport the QA agent critiques; JPEG at this size is a fraction of a full-page PNG
+VIEWPORT = {"width": 1440, "height": 900}
+JPEG_QUALITY = 80
+FLUTTER_PORT = 8080
+FLUTTER_READY_TIMEOUT = 30
+FLUTTER_RELOAD_TIMEOUT = 10
+# Root element Flutter web attaches once the app is rendered (`flutter-view` in newer Flutter releases)
+FLUTTER_ROOT_SELECTOR = "flt-glass-pane, flutter-view"
+
+# One headless browser shared by every capture. Async Playwright objects belong to the loop that
+# created them, so all captures run on the persistent background loop (see background_loop.py).
+_PW = None
+_BROWSER = None
+_browser_lock: Optional[asyncio.Lock] = None
+_capture_slots: Optional[asyncio.Semaphore] = None
+
+async def _get_browser():
+    """Returns the shared browser, launching it on first use. Must run on the background loop."""
+    global _PW, _BROWSER, _browser_lock, _capture_slots
+    if _browser_lock is None:
+        _browser_lock = asyncio.Lock()
+        _capture_slots = asyncio.Semaphore(MAX_CONCURRENT_CAPTURES)
+    async with _browser_lock:
+        if _BROWSER is None or not _BROWSER.is_connected():
+            if _PW is None:
+                _PW = await async_playwright().start()
+            _BROWSER = await _PW.chromium.launch(headless=True)
+    return _BROWSER
+
+async def _close_browser():
+    global _PW, _BROWSER
+    if _BROWSER is not None:
+        await _BROWSER.close()
+        _BROWSER = None
+    if _PW is not None:
+        await _PW.stop()
+        _PW = None
+
+def _shutdown_browser():
+    if _BROWSER is not None:
+        try:
+            background_loop.submit(_close_browser()).result(timeout=5)
+        except Exception as e:
+            print(f"[Screenshot] Failed to close browser: {e}")
+
+atexit.register(_shutdown_browser)
+
+async def _acapture(url: str, save_path: pathlib.Path, is_flutter: bool, full_page: bool, clip: Optional[dict]) -> str:
+    """Opens a fresh page on the shared browser, navigates to url and saves a JPEG screenshot."""
+    browser = await _get_browser()
+    async with _capture_slots:
+        print(f"[Screenshot] Attempting to capture {url} to {save_path}...")
+        page = await browser.new_page(viewport=VIEWPORT)
+        try:
+            if is_flutter:
+                # Flutter apps rarely go network-idle; wait for the app's root element instead
+                await page.goto(url, wait_until="domcontentloaded", timeout=10000)
+                await page.wait_for_selector(FLUTTER_ROOT_SELECTOR, state="attached", timeout=10000)
+            else:
+                await page.goto(url, wait_until="load", timeout=5000)
+                try:
+                    await page.wait_for_load_state("networkidle", timeout=2000)
+                except PlaywrightTimeoutError:
+                    pass  # Slow analytics beacons shouldn't block the capture
+            
+            await page.screenshot(path=str(save_path), type="jpeg", quality=JPEG_QUALITY, full_page=full_page, clip=clip)
+        finally:
+            await page.close()
+    return f"Successfully captured screenshot of {url}. Saved to {save_path}"
+
+def _screenshot_dir() -> pathlib.Path:
+    screenshot_dir = pathlib.Path("./workspace").resolve() / "screenshots"
+    screenshot_dir.mkdir(parents=True, exist_ok=True)
+    return screenshot_dir
+
+# Long-lived `flutter run` process, hot-reloaded between captures instead of rebuilt
+_flutter_lock = threading.Lock()
+_FLUTTER_DAEMON = None
+_flutter_ready = threading.Event()
+_flutter_reloaded = threading.Event()
+
+def _watch_flutter_output(process: subprocess.Popen, ready: threading.Event, reloaded: threading.Event):
+    """Consumes Flutter's output until it exits, flagging when the web server is up and when a reload finishes."""
+    for line in iter(process.stdout.readline, b""):
+        if b"is being served at" in line:
+            ready.set()
+        # web-server devices have no debug connection and only report "Recompile complete. Page requires refresh.";
+        # every capture opens a fresh page, so that counts as reloaded too
+        elif b"Reloaded" in line or b"Restarted application" in line or b"Recompile complete" in line:
+            reloaded.set()
+
+def _wait_for_flutter(ready: threading.Event, timeout: float = FLUTTER_READY_TIMEOUT) -> bool:
+    """Waits until Flutter reports it is serving or its port accepts connections."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if ready.is_set():
+            return True
+        try:
+            with socket.create_connection(("127.0.0.1", FLUTTER_PORT), timeout=0.25):
+                return True
+        except OSError:
+            ready.wait(0.1)
+    return False
+
+def _ensure_flutter_daemon(workspace_dir: pathlib.Path) -> bool:
+    """
+    Starts the Flutter web server if it isn't running, otherwise hot-reloads it.
+    Returns True once it is serving the current code.
+    """
+    global _FLUTTER_DAEMON, _flutter_ready
+    with _flutter_lock:
+        if _FLUTTER_DAEMON is None or _FLUTTER_DAEMON.poll() is not None:
+            print("[Screenshot] Starting Flutter web server...")
+            _FLUTTER_DAEMON = subprocess.Popen(
+                ["flutter", "run", "-d", "web-server", "--web-port", str(FLUTTER_PORT)],
+                cwd=str(workspace_dir),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT
+            )
+            _flutter_ready = threading.Event()
+            threading.Thread(
+                target=_watch_flutter_output, args=(_FLUTTER_DAEMON, _flutter_ready, _flutter_reloaded), daemon=True
+            ).start()
+            # Wait only as long as the build actually takes, instead of a fixed sleep
+            return _wait_for_flutter(_flutter_ready)
+
+        print("[Screenshot] Hot reloading Flutter web server...")
+        _flutter_reloaded.clear()
+        _FLUTTER_DAEMON.stdin.write(b"r\n")
+        _FLUTTER_DAEMON.stdin.flush()
+        return _flutter_reloaded.wait(FLUTTER_RELOAD_TIMEOUT)
+
+def shutdown_flutter_daemon():
+    """Stops the long-lived Flutter web server, if one is running."""
+    global _FLUTTER_DAEMON
+    with _flutter_lock:
+        if _FLUTTER_DAEMON is not None and _FLUTTER_DAEMON.poll() is None:
+            print("[Screenshot] Terminating Flutter web server...")
+            _FLUTTER_DAEMON.terminate()
+        _FLUTTER_DAEMON = None
+
+atexit.register(shutdown_flutter_daemon)
+
+async def _aprepare_flutter():
+    """Starts or hot-reloads the Flutter web server without blocking the event loop."""
+    workspace_dir = pathlib.Path("./workspace").resolve()
+    if not await asyncio.to_thread(_ensure_flutter_daemon, workspace_dir):
+        print("[Screenshot] Flutter web server did not report ready in time; capturing anyway.")
+
+async def acapture_app_screenshot(url: str = "http://localhost:8080", is_flutter: bool = True, filename: str = "v1.jpg",
+                                  full_page: bool = False, clip: Optional[dict] = None) -> str:
+    """Async version of capture_app_screenshot. Must be awaited on the background loop (background_loop.submit)."""
+    save_path = (_screenshot_dir() / filename).with_suffix(".jpg")
+
+    if is_flutter:
+        await _aprepare_flutter()
+
+    try:
+        return await _acapture(url, save_path, is_flutter, full_page, clip)
+    except Exception as e:
+        return f"Failed to capture screenshot: {str(e)}"
+
+def _batch_filenames(urls: List[str], filenames: Optional[List[str]]) -> List[str]:
+    if filenames is None:
+        # Unique per batch so a new batch never overwrites the previous one or a single capture
+        batch_id = uuid.uuid4().hex[:8]
+        return [f"batch_{batch_id}_{i + 1}.jpg" for i in range(len(urls))]
+    if len(filenames) != len(urls):
+        raise ValueError(f"Got {len(filenames)} filenames for {len(urls)} URLs.")
+    return filenames
+
+async def acapture_app_screenshots(urls: List[str], is_flutter: bool = True, full_page: bool = False,
+                                   filenames: Optional[List[str]] = None, clip: Optional[dict] = None) -> List[str]:
+    """Async version of capture_app_screenshots. Must be awaited on the background loop (background_loop.submit)."""
+    screenshot_dir = _screenshot_dir()
+    names = _batch_filenames(urls, filenames)
+
+    if is_flutter:
+        await _aprepare_flutter()
+
+    outcomes = await asyncio.gather(
+        *[_acapture(url, (screenshot_dir / name).with_suffix(".jpg"), is_flutter, full_page, clip) for url, name in zip(urls, names)],
+        return_exceptions=True
+    )
+    return [
+        f"Failed to capture screenshot of {url}: {str(outcome)}" if isinstance(outcome, BaseException) else outcome
+        for url, outcome in zip(urls, outcomes)
+    ]
+
 @requires_permission
 @self_healing_tool
-def capture_app_screenshot(url: str = "http://localhost:8080", is_flutter: bool = True, filename: str = "v1.png") -> str:
+def capture_app_screenshot(url: str = "http://localhost:8080", is_flutter: bool = True, filename: str = "v1.jpg",
+                           full_page: bool = False, clip: Optional[dict] = None) -> str:
     """
     Captures a screenshot of the running app. If is_flutter is True, it starts 
-    the Flutter web server first.
+    the Flutter web server first, or hot-reloads it if it is already running.
     
     Args:
         url: The internal URL to capture.
         is_flutter: Whether to run `flutter run -d chrome` before capturing.
-        filename: Name of the screenshot file.
+        filename: Name of the screenshot file. It is always saved as JPEG (.jpg).
+        full_page: Capture the whole scrollable page instead of just the viewport.
+        clip: Optional {"x", "y", "width", "height"} region to capture instead.
     """
-    workspace_dir = pathlib.Path("./workspace").resolve()
-    screenshot_dir = workspace_dir / "screenshots"
-    screenshot_dir.mkdir(parents=True, exist_ok=True)
-    
-    save_path = screenshot_dir / filename
-    flutter_process = None
+    return background_loop.submit(acapture_app_screenshot(url, is_flutter, filename, full_page, clip)).result()
 
-    if is_flutter:
-        print("[Screenshot] Starting Flutter web server...")
-        # Run flutter web headless if possible, or detached
-        flutter_process = subprocess.Popen(
-            ["flutter", "run", "-d", "web-server", "--web-port", "8080"],
-            cwd=str(workspace_dir),
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        # Give Flutter some time to build and start serving
-        time.sleep(15)
-
-    print(f"[Screenshot] Attempting to capture {url} to {save_path}...")
-    try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page()
-            
-            # Wait until there are no network connections for at least 500 ms.
-            page.goto(url, wait_until="networkidle", timeout=30000)
-            
-            page.screenshot(path=str(save_path), full_page=True)
-            browser.close()
-            
-        result_msg = f"Successfully captured screenshot of {url}. Saved to {save_path}"
-    except Exception as e:
-        result_msg = f"Failed to capture screenshot: {str(e)}"
-    finally:
-        if flutter_process:
-            print("[Screenshot] Terminating Flutter web server...")
-            flutter_process.terminate()
-
-    return result_msg
+@requires_permission
+@self_healing_tool
+def capture_app_screenshots(urls: List[str], is_flutter: bool = True, full_page: bool = False,
+                            filenames: Optional[List[str]] = None, clip: Optional[dict] = None) -> List[str]:
+    """
+    Captures screenshots of several URLs/routes of the running app concurrently.
+    Unless filenames are given, screenshots are saved as batch_<id>_1.jpg, batch_<id>_2.jpg, ...
+    in the order of `urls`, with a fresh <id> per call.
+    
+    Args:
+        urls: The internal URLs to capture.
+        is_flutter: Whether the app is served by the Flutter web server (started or hot-reloaded once).
+        full_page: Capture whole scrollable pages instead of just the viewport.
+        filenames: Optional file name per URL (same length as urls). Always saved as JPEG (.jpg).
+        clip: Optional {"x", "y", "width", "height"} region to capture on every page.
+        
+    Returns:
+        One result message per URL, in the same order.
+    """
+    return background_loop.submit(acapture_app_screenshots(urls, is_flutter, full_page, filenames, clip)).result()
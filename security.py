@@ -1,63 +1,303 @@
 import os
+import json
+import time
+import queue
+import hashlib
+import inspect
+import pathlib
 import functools
-from typing import Callable, Any
+import threading
+from typing import Callable, Any, Optional
 
-def requires_permission(func: Callable) -> Callable:
-    """
-    Decorator that pauses execution and prompts the user for (y/n) permission
-    before running sensitive tool functions.
-    """
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        tool_name = func.__name__
-        args_repr = ", ".join(repr(a) for a in args)
-        kwargs_repr = ", ".join(f"{k}={v!r}" for k, v in kwargs.items())
-        all_args = ", ".join(filter(None, [args_repr, kwargs_repr]))
+try:
+    import keyring
+except ImportError:
+    keyring = None
+
+ALLOWLIST_FILE = pathlib.Path.home() / ".agent_allow.json"
+ALWAYS_ALLOW_SECONDS = 24 * 60 * 60
+# How long the batch prompt thread keeps collecting requests before showing them together
+BATCH_WINDOW = 0.5
+
+# sig -> expiry epoch, persisted across runs ("A" answers)
+_allowlist: Optional[dict] = None
+# Call signatures granted for the rest of this process ("S" answers)
+_session_grants: set = set()
+_allowlist_lock = threading.Lock()
+# Serializes every console prompt so direct and batched prompts never interleave
+_prompt_lock = threading.Lock()
+
+_approval_queue: "queue.Queue" = queue.Queue()
+_prompt_thread: Optional[threading.Thread] = None
+
+KEYRING_SERVICE = "swarm2"
+CREDENTIAL_TTL = 3600
+
+# service_name -> (token, expiry epoch); tokens never leave this module except through resolve()
+_vault: dict = {}
+_vault_lock = threading.Lock()
+
+PROMPT_CHOICES = "Y = this call, A = this exact call always (24h), S = this exact call for the session, N = deny"
+
+def _call_signature(tool_name: str, args: tuple, kwargs: dict) -> str:
+    return hashlib.sha256(f"{tool_name}|{repr(args)}|{repr(kwargs)}".encode()).hexdigest()
+
+def _load_allowlist() -> dict:
+    global _allowlist
+    if _allowlist is None:
+        try:
+            data = json.loads(ALLOWLIST_FILE.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            data = {}
+        now = time.time()
+        _allowlist = {sig: expiry for sig, expiry in data.items() if expiry > now}
+    return _allowlist
+
+def _is_allowed(tool_name: str, sig: str) -> bool:
+    with _allowlist_lock:
+        if sig in _session_grants:
+            return True
+        return _load_allowlist().get(sig, 0) > time.time()
+
+def _grant(choice: str, tool_name: str, sig: str):
+    """Records an 'a' (persisted for 24h) or 's' (this session) answer."""
+    with _allowlist_lock:
+        if choice == 's':
+            # Same key as 'always': approving one shell command must not approve every other one
+            _session_grants.add(sig)
+        elif choice == 'a':
+            allowlist = _load_allowlist()
+            allowlist[sig] = time.time() + ALWAYS_ALLOW_SECONDS
+            tmp_file = ALLOWLIST_FILE.with_suffix(".json.tmp")
+            tmp_file.write_text(json.dumps(allowlist), encoding="utf-8")
+            os.replace(tmp_file, ALLOWLIST_FILE)
+
+def _describe_call(tool_name: str, args: tuple, kwargs: dict) -> str:
+    args_repr = ", ".join(repr(a) for a in args)
+    kwargs_repr = ", ".join(f"{k}={v!r}" for k, v in kwargs.items())
+    all_args = ", ".join(filter(None, [args_repr, kwargs_repr]))
+    return f"{tool_name}({all_args})"
+
+def _prompt_single(tool_name: str, call: str) -> str:
+    """Asks about one call and returns 'y', 'a', 's' or 'n'."""
+    with _prompt_lock:
+        print("\n" + "="*50)
+        print("⚠️  SECURITY ALERT: Agent requesting permission ⚠️")
+        print(f"Tool: {call}")
+        print("="*50)
         
+        while True:
+            choice = input(f"Allow '{tool_name}' to execute? ({PROMPT_CHOICES}): ").strip().lower()
+            if choice in ('y', 'a', 's', 'n'):
+                return choice
+            print("Invalid input. Please enter 'y', 'a', 's' or 'n'.")
+
+def _prompt_batch(pending: list):
+    """Shows all pending batched calls at once and resolves each request's decision."""
+    with _prompt_lock:
         print("\n" + "="*50)
-        print(f"⚠️  SECURITY ALERT: Agent requesting permission ⚠️")
-        print(f"Tool: {tool_name}({all_args})")
+        print(f"⚠️  SECURITY ALERT: Agent requesting permission for {len(pending)} call(s) ⚠️")
+        for i, request in enumerate(pending, 1):
+            print(f"  [{i}] {request['call']}")
         print("="*50)
         
         while True:
-            choice = input(f"Allow '{tool_name}' to execute? (y/n): ").strip().lower()
-            if choice == 'y':
-                print("[Gatekeeper] Permission granted. Executing...")
+            answer = input(f"Apply to all ({PROMPT_CHOICES}), or list numbers to allow once (e.g. 1,3): ").strip().lower()
+            if answer in ('y', 'a', 's', 'n'):
+                decisions = [answer] * len(pending)
+                break
+            try:
+                picked = {int(n) for n in answer.replace(" ", "").split(",") if n}
+            except ValueError:
+                picked = set()
+            if picked and picked <= set(range(1, len(pending) + 1)):
+                decisions = ['y' if i in picked else 'n' for i in range(1, len(pending) + 1)]
+                break
+            print("Invalid input. Please enter 'y', 'a', 's', 'n' or call numbers.")
+
+    for request, choice in zip(pending, decisions):
+        request["choice"] = choice
+        request["done"].set()
+
+def _batch_prompt_loop():
+    """Single consumer of the approval queue; groups requests that arrive close together."""
+    while True:
+        pending = [_approval_queue.get()]
+        deadline = time.monotonic() + BATCH_WINDOW
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                pending.append(_approval_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        # Calls approved for the session while they were queued don't need asking again
+        undecided = []
+        for request in pending:
+            if _is_allowed(request["tool_name"], request["sig"]):
+                request["choice"] = 'y'
+                request["done"].set()
+            else:
+                undecided.append(request)
+        if undecided:
+            try:
+                _prompt_batch(undecided)
+            except Exception as e:
+                # e.g. stdin closed: deny rather than leave the callers waiting forever
+                print(f"[Gatekeeper] Could not prompt for permission ({e!r}); denying {len(undecided)} call(s).")
+                for request in undecided:
+                    request["choice"] = 'n'
+                    request["done"].set()
+
+def _ensure_prompt_thread():
+    global _prompt_thread
+    with _allowlist_lock:
+        if _prompt_thread is None or not _prompt_thread.is_alive():
+            _prompt_thread = threading.Thread(target=_batch_prompt_loop, name="permission-prompt", daemon=True)
+            _prompt_thread.start()
+
+def _request_batched(tool_name: str, sig: str, call: str) -> str:
+    _ensure_prompt_thread()
+    request = {"tool_name": tool_name, "sig": sig, "call": call, "choice": 'n', "done": threading.Event()}
+    _approval_queue.put(request)
+    request["done"].wait()
+    return request["choice"]
+
+def requires_permission(func: Optional[Callable] = None, *, batch: bool = False) -> Callable:
+    """
+    Decorator that pauses execution and prompts the user for permission
+    before running sensitive tool functions.
+    Calls already approved with 'always' (24h) or for the session skip the prompt; both
+    grants are keyed on the tool name and arguments. With `@requires_permission(batch=True)`, concurrent calls
+    are queued and approved together from a single prompt.
+    """
+    def decorator(func: Callable) -> Callable:
+        is_method = next(iter(inspect.signature(func).parameters), None) == "self"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tool_name = func.__name__
+            # A bound `self` reprs with its memory address, which would never match in another process
+            sig = _call_signature(tool_name, args[1:] if is_method else args, kwargs)
+            
+            if _is_allowed(tool_name, sig):
+                print(f"[Gatekeeper] '{tool_name}' pre-approved. Executing...")
                 return func(*args, **kwargs)
-            elif choice == 'n':
+            
+            call = _describe_call(tool_name, args, kwargs)
+            choice = _request_batched(tool_name, sig, call) if batch else _prompt_single(tool_name, call)
+            
+            if choice == 'n':
                 print("[Gatekeeper] Permission denied by user.")
                 return "Permission Denied: User rejected the execution of this tool."
-            else:
-                print("Invalid input. Please enter 'y' or 'n'.")
+            
+            _grant(choice, tool_name, sig)
+            print("[Gatekeeper] Permission granted. Executing...")
+            return func(*args, **kwargs)
                 
-    return wrapper
+        return wrapper
+
+    # Supports both bare `@requires_permission` and `@requires_permission(batch=True)`
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+def _keyring_get(service_name: str) -> Optional[str]:
+    if keyring is None:
+        return None
+    try:
+        return keyring.get_password(KEYRING_SERVICE, service_name)
+    except Exception as e:
+        print(f"[Vault] Keyring lookup failed for {service_name}: {e}")
+        return None
+
+def _keyring_set(service_name: str, token: str) -> bool:
+    if keyring is None:
+        return False
+    try:
+        keyring.set_password(KEYRING_SERVICE, service_name, token)
+        return True
+    except Exception as e:
+        print(f"[Vault] Could not store {service_name} in the keyring: {e}")
+        return False
+
+def _vault_put(service_name: str, token: str):
+    with _vault_lock:
+        _vault[service_name] = (token, time.time() + CREDENTIAL_TTL)
+
+def _vault_get(service_name: str) -> Optional[str]:
+    with _vault_lock:
+        entry = _vault.get(service_name)
+        if entry is None:
+            return None
+        token, expiry = entry
+        if expiry <= time.time():
+            del _vault[service_name]
+            return None
+        return token
+
+def resolve(handle: str) -> str:
+    """
+    Resolves a `cred://<service>` handle returned by get_credential to the raw token.
+    Call this only at the point where the token is actually sent (e.g. an HTTP header).
+    """
+    if not handle.startswith("cred://"):
+        raise ValueError(f"Not a credential handle: {handle!r}")
+    service_name = handle[len("cred://"):]
+    token = _vault_get(service_name)
+    if token is None:
+        # Expired or never fetched in this process; look it up again without prompting
+        token = _keyring_get(service_name) or os.environ.get(f"{service_name.upper()}_TOKEN")
+        if not token:
+            raise KeyError(f"No credential available for {service_name}. Call get_credential first.")
+        _vault_put(service_name, token)
+    return token
 
 def get_credential(service_name: str) -> str:
     """
-    Retrieves a credential for a given service. First checks the environment.
+    Retrieves a credential for a given service. First checks the in-process vault,
+    then the OS keyring and the environment.
     If not found, it prompts the user to securely paste the credential.
-    The agent never handles raw passwords permanently.
+    The agent never handles raw passwords: it only receives an opaque `cred://<service>` handle.
     """
-    # 1. Check environment variables
+    handle = f"cred://{service_name}"
+
+    # 1. Check the in-process vault
+    if _vault_get(service_name) is not None:
+        return f"Credential for '{service_name}' available in active session. Handle: {handle}"
+
+    # 2. Check the OS keyring
+    token = _keyring_get(service_name)
+    if token:
+        _vault_put(service_name, token)
+        return f"Credential for '{service_name}' retrieved successfully from keyring. Handle: {handle}"
+
+    # 3. Check environment variables
     env_var_name = f"{service_name.upper()}_TOKEN"
     token = os.environ.get(env_var_name)
     
     if token:
-        return f"Credential for '{service_name}' retrieved successfully from environment."
-    
-    # 2. If missing, prompt the human
-    print("\n" + "="*50)
-    print(f"🔐 CREDENTIAL REQUIRED: {service_name} 🔐")
-    print(f"The agent requires access to {service_name}.")
-    print(f"Please authenticate in your browser and paste the token below.")
-    print("="*50)
+        _vault_put(service_name, token)
+        return f"Credential for '{service_name}' retrieved successfully from environment. Handle: {handle}"
     
-    manual_token = input(f"Enter token for {service_name}: ").strip()
+    # 4. If missing, prompt the human
+    with _prompt_lock:
+        print("\n" + "="*50)
+        print(f"🔐 CREDENTIAL REQUIRED: {service_name} 🔐")
+        print(f"The agent requires access to {service_name}.")
+        print("Please authenticate in your browser and paste the token below.")
+        print("="*50)
+        
+        manual_token = input(f"Enter token for {service_name}: ").strip()
     
     if manual_token:
-        # Note: In a real environment, you might hold this in an in-memory secure vault.
-        # Here we just inject it into the process environment temporarily.
-        os.environ[env_var_name] = manual_token
-        return f"Credential for '{service_name}' provided manually and stored in active session."
+        _vault_put(service_name, manual_token)
+        # Persist to the keyring so the next process start needs no prompt;
+        # without one, fall back to the process environment for this session.
+        if not _keyring_set(service_name, manual_token):
+            os.environ[env_var_name] = manual_token
+        return f"Credential for '{service_name}' provided manually and stored in active session. Handle: {handle}"
     else:
         return f"Error: No credential provided for {service_name}."
@@ -1,17 +1,14 @@
-import os
-from dotenv import load_dotenv
 from agno.agent import Agent
 from agno.models.google import Gemini
 from kernel import execute_shell_command, read_file, write_file
 from audit_tool import run_security_audit
-
-load_dotenv()
+from config import settings
 
 # Initialize the TDD Coder Agent
 tdd_coder_agent = Agent(
     name="CoderAgent",
     role="TDD Software Engineer",
-    model=Gemini(id=os.getenv("MAIN_MODEL", "gemini-3.1-pro-preview")),
+    model=Gemini(id=settings().main_model),
     description="You are an expert Software Engineer who strictly follows Test-Driven Development (TDD) and self-correction.",
     tools=[
         execute_shell_command, read_file, write_file, run_security_audit
@@ -35,5 +32,5 @@ def run_tdd_session(task_description: str) -> str:
     prompt = f"Please implement the following task using strict TDD:\n{task_description}\nRemember to write the test first, run your audit before finishing, and show your final secure code."
     
     print(f"[TDD Workflow] Starting session for task: {task_description}")
-    response = tdd_coder_agent.run(prompt)
-    return response.content
+    # Never served from the response cache: the session's value is its side effects (files, tests, audit)
+    return tdd_coder_agent.run(prompt).content